@@ -1,19 +1,80 @@
+import hashlib
+import diskcache
+import orjson
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
-import requests
+import httpx
 import pandas as pd
 import time
+import uuid
 import plotly.express as px
+import plotly.io as pio
 
 
 # Define API base URL
 API_BASE_URL = "https://api.sympla.com.br/public"
 
+# Connect/read timeouts (seconds) applied to every API call
+REQUEST_TIMEOUT = httpx.Timeout(30.0, connect=3.05)
+
+# Retries for transient API responses, with exponential backoff (seconds)
+RETRY_STATUSES = {429, 502, 503, 504}
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+# Concurrent page requests for paginated endpoints (kept below the client's connection limit)
+MAX_PAGE_WORKERS = 8
+
+# Optional on-disk cache of API responses, reused across app restarts
+DISK_CACHE_DIR = "./.api_cache"
+DISK_CACHE_TTL = 60 * 60  # seconds
+
+# How long (seconds) a token that got a 401 is rejected without calling the API again
+INVALID_TOKEN_TTL = 15 * 60
+
+# Maximum number of rows of a single result sent to the frontend per rerun
+RESULT_WINDOW_ROWS = 5000
+RESULT_WINDOW_STEP = 100  # Granularity of the row window slider
+
+# Known column dtypes per endpoint, applied only to the columns a response actually contains.
+# Low-cardinality text columns become categoricals; date columns are parsed once. Prices are
+# declared as Arrow doubles so the later pyarrow conversion can't narrow whole-number prices to ints.
+RESULT_DTYPES = {
+    "orders": {
+        "order_status": "category",
+        "transaction_type": "category",
+        "order_total_sale_price": "double[pyarrow]",
+        "order_total_net_value": "double[pyarrow]",
+    },
+    "participants": {
+        "order_status": "category",
+        "ticket_name": "category",
+        "sector_name": "category",
+        "ticket_sale_price": "double[pyarrow]",
+    },
+}
+DATE_COLUMNS = {"order_date", "updated_date", "approved_date", "order_updated_date", "order_approved_date"}
+
 # Set Streamlit app title with an emoji for better UX
 st.title("🔍 Sympla API Analyzer")
 
 # -------------------------------
 # Helper Function
 # -------------------------------
+
+# Total-records extractors per API version
+_EXTRACTORS = {
+    "v3": lambda pagination: pagination.get("quantity", len(pagination.get("data", []))),
+    # Assuming API v5 uses 'total_records' or 'total_items'
+    "v5": lambda pagination: pagination.get(
+        "total_records", pagination.get("total_items", len(pagination.get("data", [])))
+    ),
+}
+
+# Default fallback for unknown API versions
+def _default_extractor(pagination):
+    return len(pagination.get("data", []))
+
 def extract_total_records(pagination, api_version):
     """
     Extracts the total number of possible records from the pagination data based on the API version.
@@ -28,37 +89,439 @@ def extract_total_records(pagination, api_version):
     if not pagination:
         return 0  # No pagination data available
 
-    if api_version == "v3":
-        return pagination.get("quantity", len(pagination.get("data", [])))
-    elif api_version == "v5":
-        # Assuming API v5 uses 'total_records' or 'total_items'
-        return pagination.get("total_records", pagination.get("total_items", len(pagination.get("data", []))))
+    return _EXTRACTORS.get(api_version, _default_extractor)(pagination)
+
+def build_result_frame(records, endpoint):
+    """
+    Builds the DataFrame for an orders/participants response with its known dtypes.
+    
+    Parameters:
+        records (list): The "data" records from the API response.
+        endpoint (str): The endpoint the records came from ("orders" or "participants").
+    
+    Returns:
+        pd.DataFrame: The records, with RESULT_DTYPES and DATE_COLUMNS applied where present
+        (a date column is left as text if any of its values fails to parse)
+        and the remaining columns converted to pyarrow-backed dtypes.
+    """
+    df = pd.DataFrame.from_records(records)
+    dtypes = {col: dtype for col, dtype in RESULT_DTYPES.get(endpoint, {}).items() if col in df.columns}
+    if dtypes:
+        df = df.astype(dtypes)
+    for col in DATE_COLUMNS.intersection(df.columns):
+        try:
+            parsed = pd.to_datetime(df[col], cache=True)
+        except (ValueError, TypeError):
+            continue  # Keep the API's text when any value doesn't parse
+        # Mixed UTC offsets come back as an object column of datetimes; keep the text then too
+        if pd.api.types.is_datetime64_any_dtype(parsed):
+            df[col] = parsed
+    # Arrow-backed columns are handed to st.dataframe without a NumPy -> Arrow conversion per render
+    return df.convert_dtypes(dtype_backend="pyarrow")
+
+def row_window_max_start(n_rows):
+    """
+    Returns the largest row window start offered by the Results tab slider: the first multiple of
+    RESULT_WINDOW_STEP whose window reaches the last row, so trailing rows are never out of reach.
+    """
+    if n_rows <= RESULT_WINDOW_ROWS:
+        return 0
+    return -(-(n_rows - RESULT_WINDOW_ROWS) // RESULT_WINDOW_STEP) * RESULT_WINDOW_STEP
+
+def dataframe_hash(df):
+    """
+    Returns a content fingerprint of a DataFrame (column names plus row values) for use as a cache key.
+    Object columns are hashed as their string form, since API payloads nest dicts and lists
+    (e.g. an event's "address" or a participant's "custom_form") that can't be hashed directly.
+    """
+    object_columns = df.columns[df.dtypes == object]
+    hashable = df.astype({col: str for col in object_columns}) if len(object_columns) else df
+    return tuple(df.columns), int(pd.util.hash_pandas_object(hashable, index=False).sum())
+
+# The DataFrame itself is passed as _df so Streamlit keys the cache on df_key alone: a result's
+# rid for stored result frames, or dataframe_hash() for the frames that change (events, summary)
+@st.cache_data(max_entries=32, show_spinner=False)
+def df_to_csv(df_key, _df):
+    return _df.to_csv(index=False).encode('utf-8')
+
+# Chart builders return the figure JSON so unchanged summaries reuse the built figure across reruns
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_times_fig(summary_hash, _summary_df):
+    fig_times = px.bar(
+        _summary_df,
+        x="Combined Event ID",
+        y="API Call Time (s)",
+        color="Type",
+        barmode="group",
+        title="API Call Times by Combined Event ID and API Call Type",
+        labels={
+            "API Call Time (s)": "API Call Time (seconds)", 
+            "Combined Event ID": "API Version & Event ID", 
+            "Type": "API Call Type"
+        },
+        hover_data={"API Version": True, "Source": True}
+    )
+    return fig_times.to_json()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_records_fig(summary_hash, _summary_df):
+    fig_records = px.bar(
+        _summary_df,
+        x="Combined Event ID",
+        y="Total Records in event",
+        color="Type",
+        barmode="group",
+        title="Total Records Fetched per Combined Event ID and Type",
+        labels={"Total Records in event": "Total Records"},
+        hover_data=["API Call Time (s)", "Processing Time (s)"]
+    )
+    return fig_records.to_json()
+
+# -------------------------------
+# HTTP Client
+# -------------------------------
+@st.cache_resource
+def get_client():
+    """
+    Returns a shared httpx.Client so connections to the API are kept alive and reused
+    across reruns. With HTTP/2, concurrent page requests are multiplexed over one connection.
+    
+    Returns:
+        httpx.Client: HTTP/2-enabled client that retries failed connection attempts.
+    """
+    # http2 and limits are set on the transport, which is also what retries failed connects
+    transport = httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        retries=MAX_RETRIES,
+    )
+    return httpx.Client(
+        transport=transport,
+        timeout=REQUEST_TIMEOUT,
+        headers={"Accept": "application/json"},
+    )
+
+# -------------------------------
+# API Calls
+# -------------------------------
+class SymplaAPIError(Exception):
+    """
+    Raised for non-200 API responses. Raising (instead of returning the status) keeps
+    failed calls out of the st.cache_data caches below.
+    """
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def hash_token(token):
+    """
+    Hashes the API token so the secret itself never becomes part of a cache key.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _get_body(client, url, headers, params=None):
+    """
+    Performs a GET against the Sympla API and returns the raw response body.
+    Responses with a status in RETRY_STATUSES are retried up to MAX_RETRIES times.
+    
+    Parameters:
+        client (httpx.Client): The shared HTTP client.
+        url (str): The full endpoint URL.
+        headers (dict): Request headers carrying the S_TOKEN.
+        params (dict, optional): Query string parameters (e.g. {"page": 2}).
+    
+    Returns:
+        bytes: The JSON response body, parsed later with _parse_json.
+    
+    Raises:
+        SymplaAPIError: If the API answers with a non-200 status code.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        response = client.get(url, headers=headers, params=params)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            break
+        time.sleep(RETRY_BACKOFF * 2 ** attempt)
+    if response.status_code != 200:
+        raise SymplaAPIError(response.status_code)
+    return response.content
+
+def _parse_json(body):
+    """
+    Parses the JSON body straight from the raw UTF-8 bytes with orjson, skipping the decoded
+    response.text copy that response.json() builds first.
+    """
+    return orjson.loads(body)
+
+def _get_all_pages(path, token, stats):
+    """
+    Fetches every page of a paginated endpoint. The first page is requested alone to learn
+    pagination["total_page"]; the remaining pages are then fetched concurrently over the
+    shared client.
+    
+    Parameters:
+        path (str): Path relative to API_BASE_URL (e.g. "v3/events/123/orders").
+        token (str): The API access token.
+        stats (dict): Filled with the network time ("curl_ns") and JSON parse time ("parse_ns").
+    
+    Returns:
+        dict: The first page's JSON with "data" holding the records of all pages, in page order,
+        and "pagination" rewritten to describe the merged data ("pages_merged" holds the page count).
+    """
+    # Resolve the client here: worker threads have no Streamlit script context
+    client = get_client()
+    # The token stays a per-request header: the cached client is shared by every browser session
+    url = f"{API_BASE_URL}/{path}"
+    headers = {"S_TOKEN": token}
+    # Network and parse time are measured separately so parsing never counts as API time
+    start_ns = time.perf_counter_ns()
+    first_body = _get_body(client, url, headers)
+    stats["curl_ns"] = time.perf_counter_ns() - start_ns
+    start_ns = time.perf_counter_ns()
+    first_page = _parse_json(first_body)
+    stats["parse_ns"] = time.perf_counter_ns() - start_ns
+    stats["source"] = "api"
+
+    pagination = first_page.get("pagination") or {}
+    total_page = int(pagination.get("total_page") or 1)
+    if total_page <= 1:
+        return first_page
+
+    bodies = {}
+    start_ns = time.perf_counter_ns()
+    with ThreadPoolExecutor(max_workers=MAX_PAGE_WORKERS) as executor:
+        futures = {
+            executor.submit(_get_body, client, url, headers, {"page": page}): page
+            for page in range(2, total_page + 1)
+        }
+        for future in as_completed(futures):
+            bodies[futures[future]] = future.result()
+    stats["curl_ns"] += time.perf_counter_ns() - start_ns
+
+    start_ns = time.perf_counter_ns()
+    pages = {1: first_page.get("data", [])}
+    pages.update({page: _parse_json(body).get("data", []) for page, body in bodies.items()})
+    data = [record for page in sorted(pages) for record in pages[page]]
+    stats["parse_ns"] += time.perf_counter_ns() - start_ns
+
+    merged_pagination = {**pagination, "page": 1, "total_page": 1, "has_next": False, "pages_merged": total_page}
+    return {**first_page, "data": data, "pagination": merged_pagination}
+
+@st.cache_resource
+def get_disk_cache():
+    """
+    Returns the on-disk response cache. Values are stored as zlib-compressed JSON.
+    """
+    return diskcache.Cache(DISK_CACHE_DIR, disk=diskcache.JSONDisk, disk_compress_level=6)
+
+def _fetch(path, token, token_hash, use_disk_cache, stats, refresh=False):
+    """
+    Fetches all pages of an endpoint, going through the on-disk cache when enabled.
+    
+    Parameters:
+        path (str): Path relative to API_BASE_URL (e.g. "v3/events").
+        token (str): The API access token.
+        token_hash (str): Hash of the token, used in the disk cache key instead of the token.
+        use_disk_cache (bool): Whether to read from and write to the on-disk cache.
+        stats (dict): Filled with "source" ("api" or "disk") and, for "api", the timings.
+        refresh (bool): Skip the disk read and overwrite this call's entry with a fresh response.
+    
+    Returns:
+        dict: The combined JSON response.
+    """
+    if not use_disk_cache:
+        return _get_all_pages(path, token, stats)
+    disk_cache = get_disk_cache()
+    key = f"{path}:{token_hash}"
+    data = None if refresh else disk_cache.get(key)
+    if data is None:
+        data = _get_all_pages(path, token, stats)
+        disk_cache.set(key, data, expire=DISK_CACHE_TTL)
     else:
-        # Default fallback
-        return len(pagination.get("data", []))
+        stats["source"] = "disk"
+    return data
+
+# The leading underscore on _token tells Streamlit not to hash it; token_hash keys the cache instead.
+# _stats is only filled when the function body runs, so an empty dict means a memory cache hit.
+@st.cache_data(ttl="5m", max_entries=256, show_spinner=False)
+def _fetch_events_cached(api_version, token_hash, _token, use_disk_cache=False, _stats=None, _refresh=False):
+    return _fetch(
+        f"{api_version}/events", _token, token_hash, use_disk_cache,
+        {} if _stats is None else _stats, _refresh
+    )
+
+@st.cache_data(ttl="1m", max_entries=256, show_spinner=False)
+def _fetch_orders_cached(api_version, event_id, token_hash, _token, use_disk_cache=False, _stats=None, _refresh=False):
+    return _fetch(
+        f"{api_version}/events/{event_id}/orders", _token, token_hash, use_disk_cache,
+        {} if _stats is None else _stats, _refresh
+    )
+
+@st.cache_data(ttl="1m", max_entries=256, show_spinner=False)
+def _fetch_participants_cached(api_version, event_id, token_hash, _token, use_disk_cache=False, _stats=None, _refresh=False):
+    return _fetch(
+        f"{api_version}/events/{event_id}/participants", _token, token_hash, use_disk_cache,
+        {} if _stats is None else _stats, _refresh
+    )
+
+def fetch_with_stats(cached_fn, args, token, token_hash):
+    """
+    Calls one of the _fetch_*_cached functions and reports where the response came from.
+    With "Force refresh" checked, only this call's memory and disk cache entries are replaced;
+    entries for other endpoints, tokens and sessions are left alone.
+    
+    Parameters:
+        cached_fn (function): _fetch_events_cached, _fetch_orders_cached or _fetch_participants_cached.
+        args (tuple): The arguments before the token hash (api_version, plus event_id when needed).
+        token (str): The API access token.
+        token_hash (str): Hash of the token.
+    
+    Returns:
+        tuple: (data, stats). stats["source"] is "api", "disk" or "memory"; for "api" it also holds
+        the network time "curl_ns" and the JSON parse time "parse_ns".
+    """
+    use_disk_cache = st.session_state["disk_cache"]
+    refresh = st.session_state["force_refresh"]
+    if refresh:
+        cached_fn.clear(*args, token_hash, None, use_disk_cache)
+    stats = {}
+    data = cached_fn(*args, token_hash, token, use_disk_cache, stats, refresh)
+    return data, {"source": "memory", **stats}
+
+# Function to forget rejected tokens when "Force refresh" is enabled (cached responses are
+# refreshed per call in fetch_with_stats)
+def apply_force_refresh():
+    if st.session_state.get("force_refresh"):
+        st.session_state["invalid_tokens"] = {}
+
+# Functions to remember tokens the API rejected, so known-bad credentials skip the round-trip
+def mark_token_invalid(api_version, token_hash):
+    st.session_state["invalid_tokens"][(api_version, token_hash)] = time.monotonic()
+
+def token_known_invalid(api_version, token_hash):
+    """
+    Returns True if this token got a 401 from the API for this API version within the last
+    INVALID_TOKEN_TTL seconds. Only mark_token_invalid (called on a real 401) sets that mark,
+    so rejected clicks never extend the window.
+    """
+    marked_at = st.session_state["invalid_tokens"].get((api_version, token_hash))
+    return marked_at is not None and time.monotonic() - marked_at < INVALID_TOKEN_TTL
 
 # -------------------------------
 # Session State Management
 # -------------------------------
 
+# Columns of the per-result metadata; each result's DataFrame and pagination live in
+# st.session_state["result_frames"] under the row's "rid"
+RESULT_META_COLUMNS = [
+    "rid",
+    "event_id",
+    "type",
+    "api_version",
+    "source",
+    "curl_ns",
+    "process_ns",
+    "total_records",
+    "total_possible_records",
+]
+
+# Numeric metadata dtypes; curl_ns is nullable since cache hits have no network time
+RESULT_META_DTYPES = {
+    "curl_ns": "Int64",
+    "process_ns": "int64",
+    "total_records": "int64",
+}
+
+# Columns of the per-result summary shared by the charts, statistics and summary CSV
+SUMMARY_COLUMNS = [
+    "Combined Event ID",
+    "API Version",
+    "Type",
+    "Source",
+    "API Call Time (s)",
+    "Processing Time (s)",
+    "Total Records",
+    "Total Records in event",
+]
+
+# Repeated label columns of the summary, stored as categoricals for the charts and CSV
+SUMMARY_CATEGORIES = {
+    "Combined Event ID": "category",
+    "API Version": "category",
+    "Type": "category",
+    "Source": "category",
+}
+
+# Labels of where a result's response came from; only "api" results carry meaningful timings
+SOURCE_LABELS = {"api": "API", "memory": "Memory cache", "disk": "Disk cache"}
+
+def empty_results():
+    return pd.DataFrame(columns=RESULT_META_COLUMNS).astype(RESULT_META_DTYPES)
+
+def empty_summary():
+    return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+def _append_row(df, row, columns, dtypes=None):
+    new_row = pd.DataFrame([row], columns=columns).astype(dtypes or {})
+    if df.empty:
+        return new_row
+    return pd.concat([df, new_row], ignore_index=True)
+
+# Function to build the summary row of a single result. Responses served from a cache get NaN
+# timings, which keeps them out of the timing charts and averages.
+def summary_row(result):
+    from_api = result["source"] == "api"
+    return {
+        "Combined Event ID": f"{result['api_version']} {result['event_id']}",  # Unique identifier for charts
+        "API Version": result["api_version"],
+        "Type": result["type"].capitalize(),
+        "Source": SOURCE_LABELS[result["source"]],
+        "API Call Time (s)": result["curl_ns"] / 1e9 if from_api else float("nan"),
+        "Processing Time (s)": result["process_ns"] / 1e9 if from_api else float("nan"),
+        "Total Records": result["total_records"],
+        "Total Records in event": result["total_possible_records"],
+    }
+
+# Function to add a result to session state, keeping the summary in step with it
+def append_result(result):
+    rid = uuid.uuid4().hex
+    st.session_state["result_frames"][rid] = {"data": result["data"], "pagination": result["pagination"]}
+    meta_row = {col: result[col] for col in RESULT_META_COLUMNS if col != "rid"}
+    # Typing the new row keeps a cache hit's missing curl_ns from turning the column into object
+    st.session_state["results"] = _append_row(
+        st.session_state["results"], {"rid": rid, **meta_row}, RESULT_META_COLUMNS, RESULT_META_DTYPES
+    )
+    summary_df = _append_row(st.session_state["summary_df"], summary_row(result), SUMMARY_COLUMNS)
+    # Concatenating categoricals with different categories falls back to object, so re-cast
+    st.session_state["summary_df"] = summary_df.astype(SUMMARY_CATEGORIES)
+
 # Function to reset only the events in session state
 def reset_events():
     st.session_state["events"] = pd.DataFrame()
 
 # Function to reset both results and events in session state
 def reset_results_and_events():
-    st.session_state["results"] = []
+    st.session_state["results"] = empty_results()
+    st.session_state["result_frames"] = {}
+    st.session_state["summary_df"] = empty_summary()
     st.session_state["events"] = pd.DataFrame()
 
 # Function to reset only the results in session state
 def reset_results():
-    st.session_state["results"] = []
+    st.session_state["results"] = empty_results()
+    st.session_state["result_frames"] = {}
+    st.session_state["summary_df"] = empty_summary()
 
 # Initialize session state for storing results and events
 if "results" not in st.session_state:
-    st.session_state["results"] = []
+    st.session_state["results"] = empty_results()
+if "result_frames" not in st.session_state:
+    st.session_state["result_frames"] = {}
+if "invalid_tokens" not in st.session_state:
+    st.session_state["invalid_tokens"] = {}
 if "events" not in st.session_state:
     st.session_state["events"] = pd.DataFrame()
+if "summary_df" not in st.session_state:
+    st.session_state["summary_df"] = empty_summary()
 
 # -------------------------------
 # Sidebar Setup
@@ -84,27 +547,46 @@ api_version = st.sidebar.selectbox(
     key="api_version_select"
 )
 
+# Force refresh checkbox to bypass the cached API responses
+st.sidebar.checkbox(
+    "🔁 Force refresh",
+    help="Ignore cached API responses and always call the API (responses are cached for up to 5 minutes).",
+    key="force_refresh"
+)
+
+# Disk cache checkbox to keep API responses across app restarts
+st.sidebar.checkbox(
+    "💾 Disk cache",
+    help=f"Also store API responses on disk in {DISK_CACHE_DIR} for up to 1 hour, so they survive app restarts. "
+         "Responses may include participant personal data.",
+    key="disk_cache"
+)
+
 # Functions to fetch events
 def fetch_events():
     if st.session_state["api_token"] and st.session_state["api_version_select"]:
+        token = st.session_state["api_token"]
+        api_version = st.session_state["api_version_select"]
+        token_hash = hash_token(token)
+        apply_force_refresh()
+        if token_known_invalid(api_version, token_hash):
+            st.error("❌ Invalid or expired token.")
+            return
         with st.spinner("🔄 Fetching events..."):
             try:
-                response = requests.get(
-                    f"{API_BASE_URL}/{st.session_state['api_version_select']}/events",
-                    headers={"S_TOKEN": st.session_state["api_token"]},
-                )
-                response.encoding = 'utf-8'  # Ensure correct encoding
-                if response.status_code == 200:
-                    events = response.json().get("data", [])
-                    if events:
-                        st.session_state["events"] = pd.DataFrame(events)
-                        st.success("✅ Events fetched successfully.")
-                    else:
-                        st.warning("⚠️ No events found for the selected API version.")
-                elif response.status_code == 401:
+                data, _ = fetch_with_stats(_fetch_events_cached, (api_version,), token, token_hash)
+                events = data.get("data", [])
+                if events:
+                    st.session_state["events"] = pd.DataFrame.from_records(events).convert_dtypes(dtype_backend="pyarrow")
+                    st.success("✅ Events fetched successfully.")
+                else:
+                    st.warning("⚠️ No events found for the selected API version.")
+            except SymplaAPIError as e:
+                if e.status_code == 401:
+                    mark_token_invalid(api_version, token_hash)
                     st.error("❌ Invalid or expired token.")
                 else:
-                    st.error(f"⚠️ Error {response.status_code}: Unable to fetch events.")
+                    st.error(f"⚠️ Error {e.status_code}: Unable to fetch events.")
             except Exception as e:
                 st.error(f"❗Error: {str(e)}")
     else:
@@ -130,13 +612,16 @@ tab_fetch_data, tab_results = st.tabs(["📥 Fetch Data", "📊 Results"])
 # -------------------------------
 # Fetch Data Tab
 # -------------------------------
-with tab_fetch_data:
+
+# Tab bodies are fragments: widgets inside a tab rerun only that tab, not the whole app
+@st.fragment
+def render_fetch_tab():
     st.markdown("### 📋 Fetched Events")
     if not st.session_state["events"].empty:
         st.dataframe(st.session_state["events"])
         
         # Download button for events
-        csv_events = st.session_state["events"].to_csv(index=False).encode('utf-8')
+        csv_events = df_to_csv(dataframe_hash(st.session_state["events"]), st.session_state["events"])
         st.download_button(
             label="📥 Download Events as CSV",
             data=csv_events,
@@ -149,240 +634,236 @@ with tab_fetch_data:
     st.markdown("---")
     
     st.subheader("🔍 Check Event Details")
-    event_id = st.text_input(
-        "📇 Event ID",
-        help="Enter the ID of the event you want to check orders or participants for."
-    )
+    # Success message of the last check, carried over the full-app rerun that follows it
+    if "flash_message" in st.session_state:
+        st.success(st.session_state.pop("flash_message"))
     
-    if event_id:
+    # The form batches the Event ID input into a single rerun when a button is submitted
+    with st.form("event_detail_form"):
+        event_id = st.text_input(
+            "📇 Event ID",
+            help="Enter the ID of the event you want to check orders or participants for."
+        )
         col1, col2 = st.columns(2)
-        with col1:
-            if st.button("📦 Check Event Orders"):
-                if st.session_state["api_token"] and st.session_state["api_version_select"]:
-                    with st.spinner("🔄 Checking Event Orders..."):
-                        start_time = time.time()
-                        try:
-                            response = requests.get(
-                                f"{API_BASE_URL}/{st.session_state['api_version_select']}/events/{event_id}/orders",
-                                headers={"S_TOKEN": st.session_state["api_token"]},
-                            )
-                            curl_time = time.time() - start_time
-                            process_start_time = time.time()
-
-                            if response.status_code == 200:
-                                data = response.json()
-                                orders = data.get("data", [])
-                                pagination = data.get("pagination", {})
-                                process_time = time.time() - process_start_time
-
-                                # Extract total possible records from pagination
-                                total_possible_records = extract_total_records(pagination, st.session_state["api_version_select"])
-
-                                # Append new result to session_state["results"]
-                                st.session_state["results"].append({
-                                    "event_id": str(event_id),
-                                    "type": "orders",
-                                    "api_version": st.session_state["api_version_select"],
-                                    "data": pd.DataFrame(orders),
-                                    "pagination": pagination,
-                                    "curl_time": curl_time,
-                                    "process_time": process_time,
-                                    "total_possible_records": total_possible_records  # New field
-                                })
-                                st.success(f"✅ Orders for event {event_id} retrieved successfully.")
-                            elif response.status_code == 401:
-                                st.error(f"❌ Invalid token for event {event_id}.")
-                            else:
-                                st.error(f"⚠️ Error {response.status_code}: Unable to fetch orders for event {event_id}.")
-                        except Exception as e:
-                            st.error(f"❗Error: {str(e)}")
-                else:
-                    st.error("❗Please provide both API token and select API version.")
+        check_orders = col1.form_submit_button("📦 Check Event Orders")
+        check_participants = col2.form_submit_button("👥 Check Event Participants")
     
-        with col2:
-            if st.button("👥 Check Event Participants"):
-                if st.session_state["api_token"] and st.session_state["api_version_select"]:
-                    with st.spinner("🔄 Checking Event Participants..."):
-                        start_time = time.time()
-                        try:
-                            response = requests.get(
-                                f"{API_BASE_URL}/{st.session_state['api_version_select']}/events/{event_id}/participants",
-                                headers={"S_TOKEN": st.session_state["api_token"]},
-                            )
-                            curl_time = time.time() - start_time
-                            process_start_time = time.time()
-
-                            if response.status_code == 200:
-                                data = response.json()
-                                participants = data.get("data", [])
-                                pagination = data.get("pagination", {})
-                                process_time = time.time() - process_start_time
-
-                                # Extract total possible records from pagination
-                                total_possible_records = extract_total_records(pagination, st.session_state["api_version_select"])
-
-                                # Append new result to session_state["results"]
-                                st.session_state["results"].append({
-                                    "event_id": str(event_id),
-                                    "type": "participants",
-                                    "api_version": st.session_state["api_version_select"],
-                                    "data": pd.DataFrame(participants),
-                                    "pagination": pagination,
-                                    "curl_time": curl_time,
-                                    "process_time": process_time,
-                                    "total_possible_records": total_possible_records  # New field
-                                })
-                                st.success(f"✅ Participants for event {event_id} retrieved successfully.")
-                            elif response.status_code == 401:
-                                st.error(f"❌ Invalid token for event {event_id}.")
-                            else:
-                                st.error(f"⚠️ Error {response.status_code}: Unable to fetch participants for event {event_id}.")
-                        except Exception as e:
-                            st.error(f"❗Error: {str(e)}")
-                else:
-                    st.error("❗Please provide both API token and select API version.")
+    if (check_orders or check_participants) and not event_id:
+        st.error("❗Please enter an Event ID.")
+    
+    if check_orders and event_id:
+        token = st.session_state["api_token"]
+        api_version = st.session_state["api_version_select"]
+        if token and api_version:
+            token_hash = hash_token(token)
+            apply_force_refresh()
+            if token_known_invalid(api_version, token_hash):
+                st.error(f"❌ Invalid token for event {event_id}.")
+            else:
+                with st.spinner("🔄 Checking Event Orders..."):
+                    try:
+                        data, stats = fetch_with_stats(_fetch_orders_cached, (api_version, event_id), token, token_hash)
+
+                        # Processing covers JSON parsing (measured in the fetch layer) plus building the DataFrame
+                        process_start_ns = time.perf_counter_ns()
+                        orders = data.get("data", [])
+                        pagination = data.get("pagination", {})
+                        orders_df = build_result_frame(orders, "orders")
+                        process_ns = stats.get("parse_ns", 0) + time.perf_counter_ns() - process_start_ns
+
+                        # Extract total possible records from pagination
+                        total_possible_records = extract_total_records(pagination, api_version)
+
+                        # Append new result to session_state["results"], its frame store and the summary
+                        append_result({
+                            "event_id": str(event_id),
+                            "type": "orders",
+                            "api_version": api_version,
+                            "data": orders_df,
+                            "pagination": pagination,
+                            "source": stats["source"],
+                            "curl_ns": stats.get("curl_ns", pd.NA),
+                            "process_ns": process_ns,
+                            "total_records": len(orders),
+                            "total_possible_records": total_possible_records  # New field
+                        })
+                        st.session_state["flash_message"] = f"✅ Orders for event {event_id} retrieved successfully."
+                    except SymplaAPIError as e:
+                        if e.status_code == 401:
+                            mark_token_invalid(api_version, token_hash)
+                            st.error(f"❌ Invalid token for event {event_id}.")
+                        else:
+                            st.error(f"⚠️ Error {e.status_code}: Unable to fetch orders for event {event_id}.")
+                    except Exception as e:
+                        st.error(f"❗Error: {str(e)}")
+            # A new result also changes the Results tab, so rerun the whole app
+            if "flash_message" in st.session_state:
+                st.rerun()
+        else:
+            st.error("❗Please provide both API token and select API version.")
+    
+    if check_participants and event_id:
+        token = st.session_state["api_token"]
+        api_version = st.session_state["api_version_select"]
+        if token and api_version:
+            token_hash = hash_token(token)
+            apply_force_refresh()
+            if token_known_invalid(api_version, token_hash):
+                st.error(f"❌ Invalid token for event {event_id}.")
+            else:
+                with st.spinner("🔄 Checking Event Participants..."):
+                    try:
+                        data, stats = fetch_with_stats(_fetch_participants_cached, (api_version, event_id), token, token_hash)
+
+                        # Processing covers JSON parsing (measured in the fetch layer) plus building the DataFrame
+                        process_start_ns = time.perf_counter_ns()
+                        participants = data.get("data", [])
+                        pagination = data.get("pagination", {})
+                        participants_df = build_result_frame(participants, "participants")
+                        process_ns = stats.get("parse_ns", 0) + time.perf_counter_ns() - process_start_ns
+
+                        # Extract total possible records from pagination
+                        total_possible_records = extract_total_records(pagination, api_version)
+
+                        # Append new result to session_state["results"], its frame store and the summary
+                        append_result({
+                            "event_id": str(event_id),
+                            "type": "participants",
+                            "api_version": api_version,
+                            "data": participants_df,
+                            "pagination": pagination,
+                            "source": stats["source"],
+                            "curl_ns": stats.get("curl_ns", pd.NA),
+                            "process_ns": process_ns,
+                            "total_records": len(participants),
+                            "total_possible_records": total_possible_records  # New field
+                        })
+                        st.session_state["flash_message"] = f"✅ Participants for event {event_id} retrieved successfully."
+                    except SymplaAPIError as e:
+                        if e.status_code == 401:
+                            mark_token_invalid(api_version, token_hash)
+                            st.error(f"❌ Invalid token for event {event_id}.")
+                        else:
+                            st.error(f"⚠️ Error {e.status_code}: Unable to fetch participants for event {event_id}.")
+                    except Exception as e:
+                        st.error(f"❗Error: {str(e)}")
+            # A new result also changes the Results tab, so rerun the whole app
+            if "flash_message" in st.session_state:
+                st.rerun()
+        else:
+            st.error("❗Please provide both API token and select API version.")
     
     st.markdown("---")
     
-    if st.session_state["results"]:
+    if not st.session_state["results"].empty:
         st.markdown("### 📊 Charts")
         
-        # Prepare data for charts
-        summary_data = []
-        for result in st.session_state["results"]:
-            event_id = result["event_id"]
-            api_version = result["api_version"]
-            type_ = result["type"]
-            curl_time = result["curl_time"]
-            process_time = result["process_time"]
-            total_possible_records = result.get("total_possible_records", len(result["data"]))
-            
-            # Concatenate API Version and Event ID for unique identifier
-            combined_event_id = f"{api_version} {event_id}"
-            
-            summary_data.append({
-                "Combined Event ID": combined_event_id,  # New field for combined identifier
-                "API Version": api_version,
-                "Type": type_.capitalize(),
-                "API Call Time (s)": curl_time,
-                "Processing Time (s)": process_time,
-                "Total Possible Records": total_possible_records
-            })
-        
-        summary_df = pd.DataFrame(summary_data)
-        
-        # Ensure 'Combined Event ID' is treated as string
-        summary_df["Combined Event ID"] = summary_df["Combined Event ID"].astype(str)
+        summary_df = st.session_state["summary_df"]
         
         if not summary_df.empty:
+            summary_hash = dataframe_hash(summary_df)
+            
             # -------------------------------
             # First Chart: API Call Times
             # -------------------------------
             st.markdown("#### 📈 API Call Times by Combined Event ID and API Call Type")
-            fig_times = px.bar(
-                summary_df,
-                x="Combined Event ID",
-                y="API Call Time (s)",
-                color="Type",
-                barmode="group",
-                title="API Call Times by Combined Event ID and API Call Type",
-                labels={
-                    "API Call Time (s)": "API Call Time (seconds)", 
-                    "Combined Event ID": "API Version & Event ID", 
-                    "Type": "API Call Type"
-                },
-                hover_data={"API Version": True}
-            )
+            fig_times = pio.from_json(build_times_fig(summary_hash, summary_df))
             st.plotly_chart(fig_times, use_container_width=True, key="fetch_times_chart")
             
             # -------------------------------
             # Second Chart: Total Possible Records
             # -------------------------------
             st.markdown("#### 📈 Total Records Fetched per Combined Event ID and Type")
-            fig_records = px.bar(
-                summary_df,
-                x="Combined Event ID",
-                y="Total Possible Records",
-                color="Type",
-                barmode="group",
-                title="Total Records Fetched per Combined Event ID and Type",
-                labels={"Total Possible Records": "Total Records"},
-                hover_data=["API Call Time (s)", "Processing Time (s)"]
-            )
+            fig_records = pio.from_json(build_records_fig(summary_hash, summary_df))
             st.plotly_chart(fig_records, use_container_width=True, key="fetch_records_chart")
 
+with tab_fetch_data:
+    render_fetch_tab()
+
 # -------------------------------
 # Results Tab
 # -------------------------------
-with tab_results:
+@st.fragment
+def render_results_tab():
     st.markdown("### 📊 Results")
     
-    if st.session_state["results"]:
-        for idx, result in enumerate(st.session_state["results"], 1):
+    if not st.session_state["results"].empty:
+        for idx, result in enumerate(st.session_state["results"].itertuples(index=False), 1):
+            stored = st.session_state["result_frames"][result.rid]
             st.markdown(f"#### 📄 Result {idx}")
-            st.write(f"**Event ID**: {result['event_id']}")
-            st.write(f"**Type**: {result['type'].capitalize()}")
-            st.write(f"**API Version**: {result['api_version']}")
-            st.write(f"- **Time for API call (curl):** {result['curl_time']:.2f} seconds")
-            st.write(f"- **Time for processing:** {result['process_time']:.2f} seconds")
+            st.write(f"**Event ID**: {result.event_id}")
+            st.write(f"**Type**: {result.type.capitalize()}")
+            st.write(f"**API Version**: {result.api_version}")
+            if result.source == "api":
+                st.write(f"- **Time for API call (curl):** {result.curl_ns / 1e9:.2f} seconds")
+                st.write(f"- **Time for processing:** {result.process_ns / 1e9:.2f} seconds")
+            else:
+                st.write(f"- **Source:** {SOURCE_LABELS[result.source]} (not included in timing statistics)")
             
-            pagination = result.get("pagination", {})
-            if pagination:
+            pagination = stored["pagination"]
+            if pagination.get("pages_merged", 1) > 1:
+                st.write(
+                    f"- **Pagination:** All {pagination['pages_merged']} pages fetched and merged, "
+                    f"Total Records: {pagination.get('quantity', 0)}"
+                )
+            elif pagination:
                 st.write(
                     f"- **Pagination:** Page {pagination.get('page', 1)} of {pagination.get('total_page', 1)}, "
                     f"Total Records: {pagination.get('quantity', 0)}"
                 )
             
-            st.dataframe(result["data"])
+            # Large results are rendered one row window at a time to cap the frontend payload
+            n_rows = result.total_records
+            if n_rows > RESULT_WINDOW_ROWS:
+                start_row = st.slider(
+                    "Row window start",
+                    min_value=0,
+                    max_value=row_window_max_start(n_rows),
+                    value=0,
+                    step=RESULT_WINDOW_STEP,
+                    help=f"Showing {RESULT_WINDOW_ROWS} of {n_rows} rows. The CSV download includes every row.",
+                    key=f"row_window_{result.rid}"
+                )
+                st.dataframe(stored["data"].iloc[start_row:start_row + RESULT_WINDOW_ROWS])
+            else:
+                st.dataframe(stored["data"])
             
             # Download button for each result
-            csv_data = result["data"].to_csv(index=False).encode('utf-8')
+            # Result frames never change once stored, so the rid is enough of a cache key
+            csv_data = df_to_csv(result.rid, stored["data"])
             st.download_button(
-                label=f"📥 Download {result['type'].capitalize()} as CSV",
+                label=f"📥 Download {result.type.capitalize()} as CSV",
                 data=csv_data,
-                file_name=f"{result['event_id']}_{result['type']}.csv",
+                file_name=f"{result.event_id}_{result.type}.csv",
                 mime='text/csv',
+                key=f"download_result_{result.rid}",  # Repeated checks of one event yield identical buttons
             )
         
         # -------------------------------
         # Summary Statistics
         # -------------------------------
         st.markdown("### 📈 Summary Statistics")
-        summary_data = []
-        for result in st.session_state["results"]:
-            event_id = result["event_id"]
-            api_version = result["api_version"]
-            type_ = result["type"]
-            curl_time = result["curl_time"]
-            process_time = result["process_time"]
-            total_records = result["data"].shape[0]
-            total_possible_records = result.get("total_possible_records", len(result["data"]))
-            summary_data.append({
-                "Combined Event ID": f"{api_version} {event_id}",  # Ensure consistency
-                "API Version": api_version,
-                "Type": type_.capitalize(),
-                "API Call Time (s)": curl_time,
-                "Processing Time (s)": process_time,
-                "Total Records": total_records,
-                "Total Records in event": total_possible_records
-            })
-
-        summary_df = pd.DataFrame(summary_data)
-        
-        # Ensure 'Combined Event ID' is treated as string
-        summary_df["Combined Event ID"] = summary_df["Combined Event ID"].astype(str)
+        summary_df = st.session_state["summary_df"]
         
         if not summary_df.empty:
             # Display Summary Statistics
-            st.write("**Average API Call Time (curl):** {:.2f} seconds".format(summary_df["API Call Time (s)"].mean()))
-            st.write("**Average Processing Time:** {:.2f} seconds".format(summary_df["Processing Time (s)"].mean()))
+            # Cached results have NaN timings, so there is no average until one result came from the API
+            if summary_df["API Call Time (s)"].notna().any():
+                st.write("**Average API Call Time (curl):** {:.2f} seconds".format(summary_df["API Call Time (s)"].mean()))
+                st.write("**Average Processing Time:** {:.2f} seconds".format(summary_df["Processing Time (s)"].mean()))
+            else:
+                st.write("**Average API Call Time (curl):** no API-timed results")
+                st.write("**Average Processing Time:** no API-timed results")
             st.write("**Total Records Fetched:** {}".format(summary_df["Total Records"].sum()))
+            cached_results = int((summary_df["Source"] != SOURCE_LABELS["api"]).sum())
+            if cached_results:
+                st.write(f"**Results served from cache (excluded from timing averages):** {cached_results}")
         
         # -------------------------------
         # Download Summary Data
         # -------------------------------
         st.markdown("### 📥 Download Summary Data")
-        csv_summary = summary_df.to_csv(index=False).encode('utf-8')
+        csv_summary = df_to_csv(dataframe_hash(summary_df), summary_df)
         st.download_button(
             label="📥 Download Summary as CSV",
             data=csv_summary,
@@ -390,4 +871,7 @@ with tab_results:
             mime='text/csv',
         )
     else:
-        st.info("ℹ️ No results to display. Please fetch events and check event orders or participants.")
\ No newline at end of file
+        st.info("ℹ️ No results to display. Please fetch events and check event orders or participants.")
+
+with tab_results:
+    render_results_tab()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import time
+
+import diskcache
+import orjson
+import pandas as pd
+
+import app
+from app import RESULT_WINDOW_ROWS, RESULT_WINDOW_STEP, build_result_frame, dataframe_hash, row_window_max_start
+
+
+def test_dataframe_hash_handles_nested_columns():
+    df = pd.DataFrame({
+        "id": [1, 2],
+        "address": [{"city": "São Paulo"}, {"city": "Rio"}],
+        "custom_form": [[{"name": "a"}], []],
+    })
+
+    for frame in (df, df.convert_dtypes(dtype_backend="pyarrow")):
+        assert dataframe_hash(frame) == dataframe_hash(frame.copy())
+
+    changed = df.copy()
+    changed.at[1, "address"] = {"city": "Recife"}
+    assert dataframe_hash(changed) != dataframe_hash(df)
+
+
+def test_build_result_frame_keeps_declared_price_dtype():
+    df = build_result_frame([{"id": "O1", "order_total_sale_price": 10}, {"id": "O2", "order_total_sale_price": 25}], "orders")
+
+    assert str(df["order_total_sale_price"].dtype) == "double[pyarrow]"
+
+
+def test_row_window_reaches_last_row():
+    assert row_window_max_start(RESULT_WINDOW_ROWS) == 0
+    for n_rows in (5001, 5050, 5099, 5100, 5101, 12345):
+        max_start = row_window_max_start(n_rows)
+        assert max_start % RESULT_WINDOW_STEP == 0
+        assert max_start + RESULT_WINDOW_ROWS >= n_rows
+        assert max_start - RESULT_WINDOW_STEP + RESULT_WINDOW_ROWS < n_rows
+
+
+def test_get_all_pages_merges_pages_in_order(monkeypatch):
+    total_page = 4
+
+    def fake_get_body(client, url, headers, params=None):
+        page = (params or {}).get("page", 1)
+        time.sleep(0.05 * (total_page - page))  # Later pages finish first
+        return orjson.dumps({
+            "data": [{"id": f"{page}-{i}"} for i in range(2)],
+            "pagination": {"page": page, "total_page": total_page, "quantity": 2 * total_page, "has_next": page < total_page},
+        })
+
+    monkeypatch.setattr(app, "_get_body", fake_get_body)
+    stats = {}
+    merged = app._get_all_pages("v3/events/1/orders", "token", stats)
+
+    assert [record["id"] for record in merged["data"]] == [f"{page}-{i}" for page in range(1, total_page + 1) for i in range(2)]
+    assert merged["pagination"]["pages_merged"] == total_page
+    assert merged["pagination"]["quantity"] == 2 * total_page
+    assert merged["pagination"]["total_page"] == 1
+    assert merged["pagination"]["has_next"] is False
+    assert stats["source"] == "api"
+
+
+def test_force_refresh_only_replaces_its_own_cache_entries(monkeypatch, tmp_path):
+    disk_cache = diskcache.Cache(str(tmp_path), disk=diskcache.JSONDisk)
+    monkeypatch.setattr(app, "get_disk_cache", lambda: disk_cache)
+    monkeypatch.setattr(app, "_get_all_pages", lambda path, token, stats: {"data": ["fresh"]})
+    disk_cache.set("v3/events:hash-a", {"data": ["old-a"]})
+    disk_cache.set("v3/events:hash-b", {"data": ["old-b"]})
+
+    assert app._fetch("v3/events", "token-a", "hash-a", True, {}, refresh=True) == {"data": ["fresh"]}
+    assert disk_cache.get("v3/events:hash-a") == {"data": ["fresh"]}
+    assert disk_cache.get("v3/events:hash-b") == {"data": ["old-b"]}
+
+    # fetch_with_stats clears a single memory cache entry with the same positional arguments
+    calls = []
+    monkeypatch.setattr(app, "_fetch", lambda path, token, token_hash, *args: calls.append(token_hash) or {})
+    app._fetch_events_cached.clear()
+    for token_hash in ("hash-a", "hash-b"):
+        app._fetch_events_cached("v3", token_hash, "token", False, {}, False)
+    app._fetch_events_cached.clear("v3", "hash-a", None, False)
+    for token_hash in ("hash-a", "hash-b"):
+        app._fetch_events_cached("v3", token_hash, "token", False, {}, False)
+    assert calls == ["hash-a", "hash-b", "hash-a"]